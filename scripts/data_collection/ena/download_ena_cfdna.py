@@ -4,20 +4,160 @@ ENA cfDNA WGS Data Downloader
 Downloads cfDNA Whole Genome Sequencing data from European Nucleotide Archive (ENA)
 """
 
+import io
 import os
 import sys
 import yaml
 import json
+import mmap
+import hashlib
 import logging
-import requests
+import inspect
+import functools
+import itertools
 import subprocess
+import asyncio
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Dict, List, Optional
-from urllib.parse import urljoin
-import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin, urlsplit
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader
+    LIBYAML_AVAILABLE = False
+
+
+class ResumableTransferError(Exception):
+    """A transfer failed but left a partial file that a later attempt can resume"""
+
+
+# Transfer errors that leave a partial file worth resuming; bodies are read with
+# response.raw, so dropped connections surface as urllib3 errors
+_RESUMABLE_ERRORS = (requests.RequestException, Urllib3HTTPError, ResumableTransferError)
+
+# Response statuses retried with backoff by both the sync and async clients
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Page-cache hints are only available on some platforms (e.g. not macOS)
+FADVISE_AVAILABLE = hasattr(os, 'posix_fadvise')
+
+
+def dump_json(obj, path: Path, indent: bool = False):
+    """Write an object as JSON, using orjson if available"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2 if indent else None)
+
+
+def load_json(path: Path):
+    """Read a JSON file, using orjson if available"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def metadata_cache(request_for):
+    """
+    Cache the parsed result of a metadata getter in memory and on disk
+    
+    Entries are keyed by the request URL, its parameters and the configured cache
+    version, and looked up in an in-process LRU before the on-disk cache. Entries
+    younger than the TTL are returned without any HTTP; older entries that carry
+    an ETag are revalidated with If-None-Match, and a 304 reuses the cached
+    payload instead of downloading and parsing it again.
+    
+    Generator getters are passed through as they stream; their items are cached
+    once the generator is exhausted without a failure.
+    
+    Args:
+        request_for: Method returning the (url, params) the getter requests
+    """
+    def decorator(method):
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def generator_wrapper(self, *args, **kwargs):
+                if not self.ena_config["metadata_cache"]["enabled"]:
+                    yield from method(self, *args, **kwargs)
+                    return
+                
+                url, params = request_for(self, *args, **kwargs)
+                payload = self._lookup_cache(url, params)
+                if payload is not None:
+                    yield from payload
+                    return
+                
+                self._local.etag = None
+                self._local.failed = False
+                items = []
+                for item in method(self, *args, **kwargs):
+                    items.append(item)
+                    yield item
+                
+                if not self._local.failed:
+                    self._store_cache(url, params, items, self._local.etag)
+            
+            return generator_wrapper
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache_config = self.ena_config["metadata_cache"]
+            if not cache_config["enabled"]:
+                return method(self, *args, **kwargs)
+            
+            url, params = request_for(self, *args, **kwargs)
+            payload = self._lookup_cache(url, params)
+            if payload is not None:
+                return payload
+            
+            self._local.etag = None
+            result = method(self, *args, **kwargs)
+            self._store_cache(url, params, result, self._local.etag)
+            return result
+        
+        return wrapper
+    
+    return decorator
+
 
 class ENACfDNADownloader:
     """Download cfDNA WGS data from ENA"""
@@ -29,23 +169,199 @@ class ENACfDNADownloader:
         self.storage_config = self.config["storage"]
         self.download_config = self.config["download_settings"]
         
+        # Resolve frequently used settings once
+        cfdna_structure = self.storage_config["cfdna_structure"]
+        self._fastq_dir = Path(cfdna_structure["fastq"])
+        self._bam_dir = Path(cfdna_structure["bam"])
+        self._metadata_dir = Path(cfdna_structure["metadata"])
+        self._qc_dir = Path(cfdna_structure["qc_reports"])
+        self._frag_dir = Path(cfdna_structure["fragmentomics"])
+        self._cache_dir = self._metadata_dir / ".cache"
+        self._timeout = int(self.ena_config["timeout"])
+        self._retries = int(self.ena_config["max_retries"])
+        
         # Setup logging
         self._setup_logging()
         
+        if not LIBYAML_AVAILABLE:
+            self.logger.warning("libyaml not available, config parsed with the pure-Python loader; "
+                                "install it with: pip install pyyaml[libyaml]")
+        
         # Create directories
         self._create_directories()
         
+        # Per-thread request state (ETag of the last response)
+        self._local = threading.local()
+        
+        # In-process LRU in front of the on-disk metadata cache
+        self._memory_cache = OrderedDict()
+        self._memory_cache_lock = threading.Lock()
+        
         # Initialize session
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'FragmentFusion-DataCollector/1.0'
+            'User-Agent': 'FragmentFusion-DataCollector/1.0',
+            'Accept-Encoding': 'gzip'
         })
+        self.session.hooks['response'].append(self._record_etag)
+        
+        # Pool connections so concurrent lookups and downloads reuse warm TCP/TLS sessions
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=self._retries,
+                backoff_factor=0.3,
+                status_forcelist=_RETRY_STATUSES
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Precompiled XPath queries (lxml if available)
+        self._xp_file = self._compile_xpath('.//FILE')
+        self._xp_title_text = self._compile_text_xpath('TITLE')
+        self._xp_description_text = self._compile_text_xpath('DESCRIPTION')
         
+    @staticmethod
+    def _compile_xpath(path: str):
+        """Compile an XPath query, falling back to findall for stdlib ElementTree"""
+        if LXML_AVAILABLE:
+            return ET.XPath(path)
+        return lambda elem: elem.findall(path)
+    
+    @staticmethod
+    def _text(parent, path: str, default: str = '') -> str:
+        """Return the text of the first child matching path, with a single lookup"""
+        child = parent.find(path)
+        return (child.text or default) if child is not None else default
+    
+    @classmethod
+    def _compile_text_xpath(cls, path: str):
+        """Compile a query returning the text of the first matching child ('' if absent)"""
+        if LXML_AVAILABLE:
+            xpath = ET.XPath(f'{path}/text()', smart_strings=False)
+            return lambda elem: (xpath(elem) or [''])[0]
+        return lambda elem: cls._text(elem, path)
+    
+    def _iterparse(self, source, tag: str):
+        """
+        Stream-parse an XML body, yielding each completed element with the given tag
+        
+        Elements are cleared (together with already processed siblings under lxml)
+        once the caller moves on, so memory stays bounded by a single record.
+        """
+        if LXML_AVAILABLE:
+            context = ET.iterparse(source, events=('end',), tag=tag, huge_tree=True, recover=True)
+        else:
+            context = ET.iterparse(source, events=('end',))
+        
+        for _, elem in context:
+            if elem.tag != tag:
+                continue
+            
+            yield elem
+            
+            elem.clear()
+            if LXML_AVAILABLE:
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    
+    def _record_etag(self, response, *args, **kwargs):
+        """Session response hook remembering the ETag for the metadata cache"""
+        self._local.etag = response.headers.get('ETag')
+    
+    def _cache_path(self, url: str, params: Optional[Dict]) -> Path:
+        """Get the cache file for a metadata request"""
+        key = json.dumps([url, params, self.ena_config["metadata_cache"]["version"]], sort_keys=True)
+        return self._cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+    
+    def _remember(self, cache_file: Path, entry: Dict):
+        """Store a metadata cache entry in the in-memory LRU"""
+        with self._memory_cache_lock:
+            self._memory_cache[cache_file] = entry
+            self._memory_cache.move_to_end(cache_file)
+            if len(self._memory_cache) > self.ena_config["metadata_cache"]["memory_size"]:
+                self._memory_cache.popitem(last=False)
+    
+    def _read_cache(self, cache_file: Path) -> Optional[Dict]:
+        """Read a metadata cache entry from memory or disk, or None if missing or unreadable"""
+        with self._memory_cache_lock:
+            entry = self._memory_cache.get(cache_file)
+            if entry is not None:
+                self._memory_cache.move_to_end(cache_file)
+                return entry
+        
+        try:
+            entry = load_json(cache_file)
+        except (OSError, ValueError):
+            return None
+        
+        self._remember(cache_file, entry)
+        return entry
+    
+    def _write_cache(self, cache_file: Path, entry: Dict):
+        """Store a metadata cache entry in memory and atomically write it to disk"""
+        self._remember(cache_file, entry)
+        
+        tmp_file = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            dump_json(entry, tmp_file)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write metadata cache {cache_file}: {e}")
+    
+    def _lookup_cache(self, url: str, params: Optional[Dict], revalidate: bool = True):
+        """
+        Get the cached payload for a metadata request
+        
+        Args:
+            url: Request URL
+            params: Request parameters
+            revalidate: Whether to revalidate stale entries with a conditional request
+            
+        Returns:
+            Cached payload, or None if there is no usable entry
+        """
+        cache_file = self._cache_path(url, params)
+        entry = self._read_cache(cache_file)
+        if entry is None:
+            return None
+        
+        if time.time() - entry['cached_at'] < self.ena_config["metadata_cache"]["ttl"]:
+            return entry['payload']
+        
+        if revalidate and entry.get('etag') and self._revalidate(url, params, entry['etag']):
+            entry['cached_at'] = time.time()
+            self._write_cache(cache_file, entry)
+            return entry['payload']
+        
+        return None
+    
+    def _store_cache(self, url: str, params: Optional[Dict], result, etag: Optional[str]):
+        """Cache the parsed result of a metadata request"""
+        # Getters return empty results on errors; don't cache those
+        if result:
+            self._write_cache(self._cache_path(url, params), {
+                'cached_at': time.time(),
+                'etag': etag,
+                'payload': result
+            })
+    
+    def _revalidate(self, url: str, params: Optional[Dict], etag: str) -> bool:
+        """Check with a conditional request whether a cached response is still current"""
+        try:
+            with self.session.get(url, params=params, headers={'If-None-Match': etag},
+                                  stream=True, timeout=self._timeout) as response:
+                return response.status_code == 304
+        except requests.RequestException:
+            return False
+    
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration file"""
         try:
             with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=SafeLoader)
         except Exception as e:
             raise ValueError(f"Failed to load config {config_path}: {e}")
     
@@ -67,176 +383,462 @@ class ENACfDNADownloader:
     def _create_directories(self):
         """Create necessary directories"""
         dirs = [
-            self.storage_config["cfdna_structure"]["fastq"],
-            self.storage_config["cfdna_structure"]["bam"],
-            self.storage_config["cfdna_structure"]["metadata"],
-            self.storage_config["cfdna_structure"]["qc_reports"],
-            self.storage_config["cfdna_structure"]["fragmentomics"],
+            self._fastq_dir,
+            self._bam_dir,
+            self._metadata_dir,
+            self._qc_dir,
+            self._frag_dir,
+            self._cache_dir,
             self.storage_config["logs"]
         ]
         
         for dir_path in dirs:
             Path(dir_path).mkdir(parents=True, exist_ok=True)
-            self.logger.info(f"Created directory: {dir_path}")
+            self.logger.debug(f"Created directory: {dir_path}")
     
-    def search_cfdna_projects(self, keywords: List[str] = None) -> List[Dict]:
+    def search_cfdna_projects(self, keywords: List[str] = None) -> Iterator[Dict]:
         """
         Search for cfDNA WGS projects in ENA
         
+        Results are yielded page by page as they arrive; wrap the call in list()
+        where all projects are needed at once.
+        
         Args:
             keywords: List of search keywords
             
-        Returns:
-            List of project metadata
+        Yields:
+            Project metadata
         """
         if keywords is None:
             keywords = ["cfDNA", "cell-free DNA", "liquid biopsy", "WGS", "whole genome"]
         
-        projects = []
+        self.logger.info(f"Searching ENA for projects with keywords: {', '.join(keywords)}")
+        
+        # One query for all keywords; the server deduplicates studies. A quoted
+        # value must match the whole field, so keywords are wrapped in wildcards
+        patterns = ['*{}*'.format(keyword.replace('"', '\\"')) for keyword in keywords]
+        query = ' OR '.join(
+            f'(study_title="{pattern}" OR study_description="{pattern}")' for pattern in patterns
+        )
+        page_size = self.ena_config["search_page_size"]
         
-        for keyword in keywords:
-            self.logger.info(f"Searching ENA for projects with keyword: {keyword}")
+        project_count = 0
+        offset = 0
+        while True:
+            page = self._search_page(query, offset)
             
-            # ENA API search
-            search_url = f"{self.ena_config['base_url']}/search"
-            params = {
-                'query': f'study_title:"{keyword}" OR study_description:"{keyword}"',
-                'result': 'study',
-                'format': 'xml'
-            }
+            for project in page:
+                # Record which keywords each study matched
+                text = f"{project['title'] or ''} {project['description'] or ''}".lower()
+                project['keywords'] = [keyword for keyword in keywords if keyword.lower() in text]
+                project_count += 1
+                yield project
             
-            try:
-                response = self.session.get(search_url, params=params, timeout=self.ena_config["timeout"])
-                response.raise_for_status()
-                
-                # Parse XML response
-                root = ET.fromstring(response.content)
-                
-                for study in root.findall('.//STUDY'):
-                    project = {
-                        'accession': study.get('accession'),
-                        'title': study.find('DESCRIPTOR/STUDY_TITLE').text if study.find('DESCRIPTOR/STUDY_TITLE') is not None else '',
-                        'description': study.find('DESCRIPTOR/STUDY_DESCRIPTION').text if study.find('DESCRIPTOR/STUDY_DESCRIPTION') is not None else '',
-                        'submission_date': study.get('submission_date'),
-                        'center_name': study.get('center_name', ''),
-                        'broker_name': study.get('broker_name', ''),
-                        'keyword': keyword
-                    }
-                    projects.append(project)
-                    
-            except Exception as e:
-                self.logger.error(f"Error searching for keyword '{keyword}': {e}")
-                continue
+            if len(page) < page_size:
+                break
+            offset += page_size
         
-        self.logger.info(f"Found {len(projects)} cfDNA projects")
-        return projects
+        self.logger.info(f"Found {project_count} cfDNA projects")
     
-    def get_project_samples(self, project_accession: str) -> List[Dict]:
+    def _search_request(self, query: str, offset: int):
+        """Build one page of the ENA portal study search request"""
+        search_url = f"{self.ena_config['portal_url']}/search"
+        params = {
+            'query': query,
+            'result': 'study',
+            'fields': 'study_accession,study_title,study_description,center_name,first_public',
+            'format': 'json',
+            'limit': self.ena_config["search_page_size"],
+            'offset': offset
+        }
+        return search_url, params
+    
+    @metadata_cache(_search_request)
+    def _search_page(self, query: str, offset: int) -> List[Dict]:
+        """
+        Fetch one page of ENA study search results
+        
+        Args:
+            query: ENA search query
+            offset: Index of the first result to return
+            
+        Returns:
+            List of project metadata
+        """
+        # ENA portal API search
+        search_url, params = self._search_request(query, offset)
+        
+        try:
+            response = self.session.get(search_url, params=params, timeout=self._timeout)
+            response.raise_for_status()
+            
+            # The portal answers an empty result set with no body
+            studies = response.json() if response.content else []
+            projects = []
+            
+            for study in studies:
+                project = {
+                    'accession': study.get('study_accession'),
+                    'title': study.get('study_title', ''),
+                    'description': study.get('study_description', ''),
+                    'submission_date': study.get('first_public'),
+                    'center_name': study.get('center_name', ''),
+                    'broker_name': ''
+                }
+                projects.append(project)
+            
+            return projects
+            
+        except Exception as e:
+            self.logger.error(f"Error searching ENA projects (offset {offset}): {e}")
+            return []
+    
+    def _browser_request(self, accession: str):
+        """Build the ENA browser API XML request for an accession"""
+        return f"{self.ena_config['base_url']}/{accession}", None
+    
+    @metadata_cache(_browser_request)
+    def get_project_samples(self, project_accession: str) -> Iterator[Dict]:
         """
         Get sample information for a specific project
         
         Args:
             project_accession: ENA project accession
             
-        Returns:
-            List of sample metadata
+        Yields:
+            Sample metadata, as each SAMPLE element is parsed
         """
         self.logger.info(f"Getting samples for project: {project_accession}")
         
         # ENA API to get project samples
-        url = f"{self.ena_config['base_url']}/{project_accession}"
+        url, _ = self._browser_request(project_accession)
         
         try:
-            response = self.session.get(url, timeout=self.ena_config["timeout"])
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            samples = []
-            
-            for sample in root.findall('.//SAMPLE'):
-                sample_data = {
-                    'accession': sample.get('accession'),
-                    'title': sample.find('TITLE').text if sample.find('TITLE') is not None else '',
-                    'description': sample.find('DESCRIPTION').text if sample.find('DESCRIPTION') is not None else '',
-                    'taxon_id': sample.get('taxon_id'),
-                    'submission_date': sample.get('submission_date'),
-                    'attributes': {}
-                }
-                
-                # Extract sample attributes
-                for attr in sample.findall('.//SAMPLE_ATTRIBUTE'):
-                    tag = attr.find('TAG')
-                    value = attr.find('VALUE')
-                    if tag is not None and value is not None:
-                        sample_data['attributes'][tag.text] = value.text
-                
-                samples.append(sample_data)
+            with self.session.get(url, stream=True, timeout=self._timeout) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                sample_count = 0
+                for sample_data in self._parse_samples(response.raw):
+                    sample_count += 1
+                    yield sample_data
             
-            self.logger.info(f"Found {len(samples)} samples in project {project_accession}")
-            return samples
+            self.logger.info(f"Found {sample_count} samples in project {project_accession}")
             
         except Exception as e:
+            self._local.failed = True
             self.logger.error(f"Error getting samples for project {project_accession}: {e}")
-            return []
     
-    def get_sample_runs(self, sample_accession: str) -> List[Dict]:
+    @metadata_cache(_browser_request)
+    def get_sample_runs(self, sample_accession: str) -> Iterator[Dict]:
         """
         Get run information for a specific sample
         
         Args:
             sample_accession: ENA sample accession
             
-        Returns:
-            List of run metadata
+        Yields:
+            Run metadata, as each RUN element is parsed
         """
         self.logger.info(f"Getting runs for sample: {sample_accession}")
         
-        url = f"{self.ena_config['base_url']}/{sample_accession}"
+        url, _ = self._browser_request(sample_accession)
+        
+        try:
+            with self.session.get(url, stream=True, timeout=self._timeout) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                run_count = 0
+                for run_data in self._parse_runs(response.raw):
+                    run_count += 1
+                    yield run_data
+            
+            self.logger.info(f"Found {run_count} runs for sample {sample_accession}")
+            
+        except Exception as e:
+            self._local.failed = True
+            self.logger.error(f"Error getting runs for sample {sample_accession}: {e}")
+    
+    def _filereport_request(self, project_accession: str):
+        """Build the ENA portal file report request for a project"""
+        url = f"{self.ena_config['portal_url']}/filereport"
+        params = {
+            'accession': project_accession,
+            'result': 'read_run',
+            'fields': 'run_accession,sample_accession,secondary_sample_accession,'
+                      'instrument_platform,instrument_model,fastq_ftp,fastq_md5,fastq_bytes,'
+                      'read_count,base_count',
+            'format': 'json'
+        }
+        return url, params
+    
+    @metadata_cache(_filereport_request)
+    def get_project_filereport(self, project_accession: str) -> Dict[str, List[Dict]]:
+        """
+        Get run and FASTQ file information for every sample of a project in one request
+        
+        Uses the portal API JSON file report; the XML browser API is only needed
+        for samples missing from it.
+        
+        Args:
+            project_accession: ENA project accession
+            
+        Returns:
+            Mapping of sample accession (both BioSample and ENA forms) to run
+            metadata in the same format as get_sample_runs
+        """
+        self.logger.info(f"Getting file report for project: {project_accession}")
+        
+        url, params = self._filereport_request(project_accession)
         
         try:
-            response = self.session.get(url, timeout=self.ena_config["timeout"])
+            response = self.session.get(url, params=params, timeout=self._timeout)
             response.raise_for_status()
             
-            root = ET.fromstring(response.content)
-            runs = []
-            
-            for run in root.findall('.//RUN'):
-                run_data = {
-                    'accession': run.get('accession'),
-                    'alias': run.get('alias'),
-                    'title': run.find('TITLE').text if run.find('TITLE') is not None else '',
-                    'instrument_platform': run.get('instrument_platform'),
-                    'instrument_model': run.get('instrument_model'),
-                    'base_count': run.get('base_count'),
-                    'read_count': run.get('read_count'),
-                    'run_date': run.get('run_date'),
-                    'files': []
+            sample_runs = self._parse_filereport(response.json() if response.content else [])
+            run_count = len({run['accession'] for runs in sample_runs.values() for run in runs})
+            
+            self.logger.info(f"Found {run_count} runs in file report for project {project_accession}")
+            return sample_runs
+            
+        except Exception as e:
+            self.logger.error(f"Error getting file report for project {project_accession}: {e}")
+            return {}
+    
+    def _parse_samples(self, source) -> Iterator[Dict]:
+        """
+        Parse sample metadata from an ENA browser API XML body
+        
+        Args:
+            source: File-like object with the XML body
+            
+        Yields:
+            Sample metadata
+        """
+        for sample in self._iterparse(source, 'SAMPLE'):
+            sample_data = {
+                'accession': sample.get('accession'),
+                'title': self._xp_title_text(sample),
+                'description': self._xp_description_text(sample),
+                'taxon_id': sample.get('taxon_id'),
+                'submission_date': sample.get('submission_date'),
+                'attributes': {}
+            }
+            
+            # Extract sample attributes, reading TAG and VALUE in one pass over
+            # each attribute's children
+            for attr in sample.iter('SAMPLE_ATTRIBUTE'):
+                tag = value = None
+                for child in attr:
+                    if child.tag == 'TAG':
+                        tag = child.text
+                    elif child.tag == 'VALUE':
+                        value = child.text
+                if tag:
+                    sample_data['attributes'][tag] = value or ''
+            
+            yield sample_data
+    
+    def _parse_runs(self, source) -> Iterator[Dict]:
+        """
+        Parse run metadata from an ENA browser API XML body
+        
+        Args:
+            source: File-like object with the XML body
+            
+        Yields:
+            Run metadata
+        """
+        for run in self._iterparse(source, 'RUN'):
+            run_data = {
+                'accession': run.get('accession'),
+                'alias': run.get('alias'),
+                'title': self._xp_title_text(run),
+                'instrument_platform': run.get('instrument_platform'),
+                'instrument_model': run.get('instrument_model'),
+                'base_count': run.get('base_count'),
+                'read_count': run.get('read_count'),
+                'run_date': run.get('run_date'),
+                'files': []
+            }
+            
+            # Get file information
+            for file_elem in self._xp_file(run):
+                file_data = {
+                    'filename': file_elem.get('filename'),
+                    'filetype': file_elem.get('filetype'),
+                    'checksum': file_elem.get('checksum'),
+                    'checksum_method': file_elem.get('checksum_method'),
+                    'unencrypted_checksum': file_elem.get('unencrypted_checksum'),
+                    'unencrypted_checksum_method': file_elem.get('unencrypted_checksum_method')
                 }
-                
-                # Get file information
-                for file_elem in run.findall('.//FILE'):
-                    file_data = {
-                        'filename': file_elem.get('filename'),
-                        'filetype': file_elem.get('filetype'),
-                        'checksum': file_elem.get('checksum'),
-                        'checksum_method': file_elem.get('checksum_method'),
-                        'unencrypted_checksum': file_elem.get('unencrypted_checksum'),
-                        'unencrypted_checksum_method': file_elem.get('unencrypted_checksum_method')
-                    }
-                    run_data['files'].append(file_data)
-                
-                runs.append(run_data)
+                run_data['files'].append(file_data)
             
-            self.logger.info(f"Found {len(runs)} runs for sample {sample_accession}")
-            return runs
+            yield run_data
+    
+    def _parse_filereport(self, rows: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Group ENA portal file report rows into run metadata by sample
+        
+        Args:
+            rows: Decoded JSON file report rows
+            
+        Returns:
+            Mapping of sample accession (both BioSample and ENA forms) to run
+            metadata in the same format as get_sample_runs
+        """
+        sample_runs = {}
+        
+        for row in rows:
+            paths = row['fastq_ftp'].split(';') if row.get('fastq_ftp') else []
+            md5s = row['fastq_md5'].split(';') if row.get('fastq_md5') else []
+            sizes = row['fastq_bytes'].split(';') if row.get('fastq_bytes') else []
+            
+            run_data = {
+                'accession': row['run_accession'],
+                'alias': None,
+                'title': '',
+                'instrument_platform': row.get('instrument_platform'),
+                'instrument_model': row.get('instrument_model'),
+                'base_count': row.get('base_count'),
+                'read_count': row.get('read_count'),
+                'run_date': None,
+                'files': []
+            }
+            
+            for i, path in enumerate(paths):
+                file_data = {
+                    'filename': path.rsplit('/', 1)[-1],
+                    'filetype': 'fastq',
+                    'url': f"https://{path}",
+                    'size': int(sizes[i]) if i < len(sizes) and sizes[i] else None,
+                    'checksum': md5s[i] if i < len(md5s) else None,
+                    'checksum_method': 'MD5',
+                    'unencrypted_checksum': None,
+                    'unencrypted_checksum_method': None
+                }
+                run_data['files'].append(file_data)
+            
+            for sample_accession in {row.get('sample_accession'), row.get('secondary_sample_accession')}:
+                if sample_accession:
+                    sample_runs.setdefault(sample_accession, []).append(run_data)
+        
+        return sample_runs
+    
+    def crawl_metadata(self, project_accessions: List[str], max_samples: Optional[int] = None):
+        """
+        Prefetch sample and run metadata for several projects concurrently
+        
+        The metadata requests are issued from a single asyncio event loop over an
+        httpx client and their parsed results land in the metadata cache, so the
+        download phase that follows reads them from there instead of waiting on
+        one round trip after another.
+        
+        Args:
+            project_accessions: ENA project accessions
+            max_samples: Maximum number of samples per project to crawl runs for
+                (None for all), matching the download limit
+        """
+        if not HTTPX_AVAILABLE:
+            self.logger.info("httpx not installed; metadata will be fetched during download")
+            return
+        
+        if not self.ena_config["metadata_cache"]["enabled"]:
+            self.logger.info("Metadata cache disabled; skipping metadata crawl")
+            return
+        
+        asyncio.run(self._acrawl(project_accessions, max_samples))
+    
+    async def _acrawl(self, project_accessions: List[str], max_samples: Optional[int] = None):
+        """Crawl metadata for all projects over one HTTP/2-capable async client"""
+        transport = httpx.AsyncHTTPTransport(
+            http2=H2_AVAILABLE,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            retries=self._retries
+        )
+        semaphore = asyncio.Semaphore(self.ena_config["crawl_concurrency"])
+        
+        async with httpx.AsyncClient(
+            transport=transport,
+            headers={'User-Agent': self.session.headers['User-Agent']},
+            timeout=self._timeout
+        ) as client:
+            await asyncio.gather(*(
+                self._acrawl_project(client, semaphore, project_accession, max_samples)
+                for project_accession in project_accessions
+            ))
+    
+    async def _acrawl_project(self, client, semaphore, project_accession: str,
+                              max_samples: Optional[int] = None):
+        """Crawl samples, the file report and fallback sample runs for one project"""
+        self.logger.info(f"Crawling metadata for project: {project_accession}")
+        
+        samples, sample_runs = await asyncio.gather(
+            self._afetch(client, semaphore, self._browser_request(project_accession),
+                         lambda response: list(self._parse_samples(io.BytesIO(response.content)))),
+            self._afetch(client, semaphore, self._filereport_request(project_accession),
+                         lambda response: self._parse_filereport(response.json() if response.content else []))
+        )
+        
+        # Only samples that will be downloaded and are missing from the file
+        # report need a per-sample lookup
+        missing_samples = [
+            sample['accession'] for sample in (samples or [])[:max_samples or None]
+            if sample['accession'] not in (sample_runs or {})
+        ]
+        await asyncio.gather(*(
+            self._afetch(client, semaphore, self._browser_request(sample_accession),
+                         lambda response: list(self._parse_runs(io.BytesIO(response.content))))
+            for sample_accession in missing_samples
+        ))
+    
+    async def _afetch(self, client, semaphore, request, parse):
+        """
+        Fetch and parse one metadata request, going through the metadata cache
+        
+        Args:
+            client: httpx.AsyncClient to issue the request with
+            semaphore: Semaphore bounding concurrent requests
+            request: (url, params) of the request
+            parse: Callable turning the response into the cached payload
+            
+        Returns:
+            Parsed payload, or None on error
+        """
+        url, params = request
+        payload = self._lookup_cache(url, params, revalidate=False)
+        if payload is not None:
+            return payload
+        
+        try:
+            # httpx transports only retry failed connections, so retry
+            # throttled and failed responses here like the sync session does
+            for attempt in range(self._retries + 1):
+                async with semaphore:
+                    response = await client.get(url, params=params)
+                if response.status_code not in _RETRY_STATUSES or attempt == self._retries:
+                    break
+                await asyncio.sleep(self._retry_delay(response, attempt, 0.3))
+            response.raise_for_status()
+            
+            result = parse(response)
+            self._store_cache(url, params, result, response.headers.get('ETag'))
+            return result
             
         except Exception as e:
-            self.logger.error(f"Error getting runs for sample {sample_accession}: {e}")
-            return []
+            self.logger.error(f"Error crawling {url}: {e}")
+            return None
+    
+    @staticmethod
+    def _retry_delay(response, attempt: int, backoff_factor: float) -> float:
+        """Get the seconds to wait before retrying a response, honouring Retry-After"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        return backoff_factor * (2 ** attempt)
     
     def download_fastq_file(self, run_accession: str, filename: str, file_info: Dict) -> bool:
         """
-        Download a FASTQ file from ENA FTP
+        Download a FASTQ file from the ENA FASTQ mirror
         
         Args:
             run_accession: ENA run accession
@@ -246,62 +848,298 @@ class ENACfDNADownloader:
         Returns:
             True if download successful, False otherwise
         """
-        # Construct FTP URL
-        ftp_url = f"{self.ena_config['ftp_base']}/{run_accession[:6]}/{run_accession}/{filename}"
+        # Construct file URL (the file report already provides the full path)
+        ftp_url = file_info.get('url') or f"{self.ena_config['ftp_base']}/{run_accession[:6]}/{run_accession}/{filename}"
         
         # Local file path
-        local_path = Path(self.storage_config["cfdna_structure"]["fastq"]) / filename
+        local_path = self._fastq_dir / filename
+        
+        transfer_method = self.download_config["transfer_method"]
         
         # Check if file already exists and is complete
+        prefix_hasher = None
         if local_path.exists():
-            if self._validate_file(local_path, file_info):
+            # A streamed download resumes from the existing bytes, so hash them once
+            # here for both the completeness check and the resumed checksum
+            if transfer_method == 'stream' and self.download_config["resume_downloads"]:
+                prefix_hasher = self._hash_prefix(local_path, file_info)
+            
+            if self._validate_file(local_path, file_info, prefix_hasher.copy() if prefix_hasher else None):
                 self.logger.info(f"File already exists and is valid: {filename}")
+                self._drop_page_cache(local_path)
                 return True
         
         self.logger.info(f"Downloading: {filename}")
         
-        # Download using wget with resume capability
-        cmd = [
-            'wget',
-            '--continue',  # Resume download
-            '--timeout', str(self.ena_config["timeout"]),
-            '--tries', str(self.ena_config["max_retries"]),
-            '--output-document', str(local_path),
-            ftp_url
-        ]
-        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.ena_config["timeout"])
+            if transfer_method == 'aspera':
+                hasher = self._download_aspera(ftp_url, local_path)
+            elif transfer_method == 'parallel_http':
+                hasher = self._download_parallel_http(ftp_url, local_path, file_info)
+            else:
+                hasher = self._download_stream(ftp_url, local_path, file_info, prefix_hasher)
             
-            if result.returncode == 0:
-                # Validate downloaded file
-                if self._validate_file(local_path, file_info):
-                    self.logger.info(f"Successfully downloaded: {filename}")
-                    return True
-                else:
-                    self.logger.error(f"File validation failed: {filename}")
-                    local_path.unlink(missing_ok=True)
-                    return False
+            # Validate downloaded file
+            if self._validate_file(local_path, file_info, hasher):
+                self.logger.info(f"Successfully downloaded: {filename}")
+                self._drop_page_cache(local_path)
+                return True
             else:
-                self.logger.error(f"Download failed for {filename}: {result.stderr}")
+                self.logger.error(f"File validation failed: {filename}")
+                local_path.unlink(missing_ok=True)
                 return False
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"Download timeout for {filename}")
-            local_path.unlink(missing_ok=True)
+        except _RESUMABLE_ERRORS as e:
+            # Keep the partial file so the next attempt can resume it
+            self.logger.error(f"Download failed for {filename}: {e}")
             return False
         except Exception as e:
             self.logger.error(f"Error downloading {filename}: {e}")
             local_path.unlink(missing_ok=True)
             return False
     
-    def _validate_file(self, file_path: Path, file_info: Dict) -> bool:
+    def _hash_prefix(self, local_path: Path, file_info: Dict):
+        """
+        Hash the bytes of a partial or existing file
+        
+        Args:
+            local_path: Path to the file
+            file_info: File metadata with checksum information
+            
+        Returns:
+            hashlib object fed with the file contents, or None if not validating
+            or the file could not be read
+        """
+        hasher = self._checksum_hasher(file_info)
+        if hasher is None:
+            return None
+        
+        try:
+            self._hash_file(local_path, hasher)
+        except OSError as e:
+            self.logger.warning(f"Error hashing {local_path}: {e}")
+            return None
+        return hasher
+    
+    def _download_stream(self, url: str, local_path: Path, file_info: Dict, prefix_hasher=None):
+        """
+        Download a file over a single streamed request, resuming partial files
+        
+        Args:
+            url: File URL
+            local_path: Destination path
+            file_info: File metadata
+            prefix_hasher: hashlib object already fed with the partial file, so
+                resuming does not read it again
+            
+        Returns:
+            hashlib object fed with the file contents, or None if not validating
+        """
+        # Resume a partial download if one is present
+        resume_from = 0
+        if self.download_config["resume_downloads"] and local_path.exists():
+            resume_from = local_path.stat().st_size
+        
+        # Checksum is computed while streaming so the file is only read once; the
+        # existing bytes are hashed before the request so its connection never idles
+        hasher = self._checksum_hasher(file_info)
+        if resume_from and hasher is not None:
+            hasher = prefix_hasher or self._hash_prefix(local_path, file_info)
+        
+        # FASTQ files are already gzipped; ask for the raw bytes
+        headers = {'Accept-Encoding': 'identity'}
+        if resume_from:
+            headers['Range'] = f'bytes={resume_from}-'
+        
+        with self.session.get(url, headers=headers, stream=True, timeout=self._timeout) as response:
+            # 416 means the partial file already holds every byte
+            if resume_from and response.status_code == 416:
+                return hasher
+            
+            response.raise_for_status()
+            
+            # Append only if the server honoured the Range request; a full
+            # response replaces the file, so the prefix hash is dropped
+            mode = 'ab' if response.status_code == 206 else 'wb'
+            if mode == 'wb':
+                hasher = self._checksum_hasher(file_info)
+            
+            with open(local_path, mode) as f:
+                if FADVISE_AVAILABLE:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                for chunk in response.raw.stream(self.download_config["chunk_size"], decode_content=False):
+                    f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+        
+        return hasher
+    
+    def _download_parallel_http(self, url: str, local_path: Path, file_info: Dict):
+        """
+        Download a file with concurrent byte-range requests written at their offsets
+        
+        Falls back to a single streamed download if the size is unknown or the
+        server does not support range requests.
+        
+        Args:
+            url: File URL
+            local_path: Destination path
+            file_info: File metadata
+            
+        Returns:
+            hashlib object if the streamed fallback was used, otherwise None
+        """
+        size = file_info.get('size')
+        if not size:
+            response = self.session.head(url, headers={'Accept-Encoding': 'identity'},
+                                         allow_redirects=True, timeout=self._timeout)
+            response.raise_for_status()
+            if response.headers.get('Accept-Ranges') != 'bytes':
+                return self._download_stream(url, local_path, file_info)
+            size = int(response.headers.get('Content-Length', 0))
+        
+        if not size:
+            return self._download_stream(url, local_path, file_info)
+        
+        segment_size = -(-size // self.download_config["parallel_segments"])
+        ranges = [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
+        
+        # Segments are written into a preallocated file under a temporary name so
+        # an interrupted download never looks like a complete file
+        part_path = local_path.with_name(f"{local_path.name}.part")
+        with open(part_path, 'wb') as f:
+            f.truncate(size)
+        
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(self._fetch_range, url, fd, start, end) for start, end in ranges]
+                for future in futures:
+                    future.result()
+        except Exception:
+            # Segments land out of order, so a partial file cannot be resumed
+            part_path.unlink(missing_ok=True)
+            raise
+        finally:
+            os.close(fd)
+        
+        os.replace(part_path, local_path)
+        return None
+    
+    def _fetch_range(self, url: str, fd: int, start: int, end: int):
+        """Download bytes start..end (inclusive) of a file and write them at the same offset"""
+        headers = {'Accept-Encoding': 'identity', 'Range': f'bytes={start}-{end}'}
+        
+        with self.session.get(url, headers=headers, stream=True, timeout=self._timeout) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise requests.RequestException(f"Server ignored range request for {url}")
+            
+            offset = start
+            for chunk in response.raw.stream(self.download_config["chunk_size"], decode_content=False):
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+        
+        if offset != end + 1:
+            raise requests.RequestException(f"Incomplete range {start}-{end} for {url}")
+    
+    def _download_aspera(self, url: str, local_path: Path):
+        """
+        Download a file with the Aspera ascp client from the ENA FASP endpoint
+        
+        Args:
+            url: File URL on the ENA FASTQ mirror
+            local_path: Destination path
+            
+        Returns:
+            None; the file is hashed from disk during validation
+        """
+        aspera_config = self.ena_config["aspera"]
+        source = f"{aspera_config['host']}:{urlsplit(url).path}"
+        
+        cmd = [
+            'ascp',
+            '-QT',
+            '-l', aspera_config["rate"],
+            '-P', str(aspera_config["port"]),
+            '-k', '1',  # Resume partial transfers
+            '-i', os.path.expanduser(aspera_config["key"]),
+            source,
+            str(local_path)
+        ]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            # ascp resumes the partial file on the next attempt (-k 1)
+            raise ResumableTransferError(f"ascp failed: {result.stderr}")
+        
+        return None
+    
+    def _checksum_hasher(self, file_info: Dict):
+        """
+        Create a hashlib object matching a file's checksum method
+        
+        Args:
+            file_info: File metadata with checksum information
+            
+        Returns:
+            hashlib object, or None if there is nothing to validate against
+        """
+        if not self.download_config["validate_downloads"]:
+            return None
+        
+        if not (file_info.get('checksum') and file_info.get('checksum_method')):
+            return None
+        
+        checksum_method = file_info['checksum_method'].lower()
+        try:
+            return hashlib.new(checksum_method)
+        except ValueError:
+            self.logger.warning(f"Unknown checksum method: {checksum_method}")
+            return None
+    
+    def _hash_file(self, file_path: Path, hasher) -> None:
+        """Feed the contents of a file into a hashlib object via a read-only memory map"""
+        with open(file_path, 'rb') as f:
+            # Empty files cannot be mapped (and add nothing to the digest)
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            if FADVISE_AVAILABLE:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+    
+    def _drop_page_cache(self, file_path: Path) -> None:
+        """
+        Tell the kernel the cached pages of a validated file will not be reused
+        
+        Downloaded FASTQ files are written and checksummed once, so dropping
+        their pages leaves the page cache to downstream processing steps.
+        
+        Args:
+            file_path: Path to the validated file
+        """
+        if not (FADVISE_AVAILABLE and self.download_config["drop_page_cache"]):
+            return
+        
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            self.logger.debug(f"Could not drop page cache for {file_path}: {e}")
+    
+    def _validate_file(self, file_path: Path, file_info: Dict, hasher=None) -> bool:
         """
         Validate downloaded file using checksum
         
         Args:
             file_path: Path to the downloaded file
             file_info: File metadata with checksum information
+            hasher: hashlib object already fed with the file contents while
+                downloading; the file is hashed from disk if not given
             
         Returns:
             True if file is valid, False otherwise
@@ -312,37 +1150,24 @@ class ENACfDNADownloader:
         if not file_path.exists():
             return False
         
-        # Check file size (basic validation)
-        if file_path.stat().st_size == 0:
+        # Check file size (basic validation); a resumable partial file is short
+        file_size = file_path.stat().st_size
+        if file_size == 0 or (file_info.get('size') and file_size != int(file_info['size'])):
             return False
         
         # Check checksum if available
-        if file_info.get('checksum') and file_info.get('checksum_method'):
-            checksum_method = file_info['checksum_method'].lower()
-            expected_checksum = file_info['checksum']
+        if hasher is None:
+            hasher = self._checksum_hasher(file_info)
+            if hasher is None:
+                return True
             
             try:
-                if checksum_method == 'md5':
-                    cmd = ['md5sum', str(file_path)]
-                elif checksum_method == 'sha256':
-                    cmd = ['sha256sum', str(file_path)]
-                else:
-                    self.logger.warning(f"Unknown checksum method: {checksum_method}")
-                    return True
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    actual_checksum = result.stdout.split()[0]
-                    return actual_checksum == expected_checksum
-                else:
-                    self.logger.warning(f"Could not compute checksum for {file_path}")
-                    return True
-                    
-            except Exception as e:
+                self._hash_file(file_path, hasher)
+            except OSError as e:
                 self.logger.warning(f"Error validating checksum for {file_path}: {e}")
                 return True
         
-        return True
+        return hasher.hexdigest() == file_info['checksum'].lower()
     
     def download_project_data(self, project_accession: str, max_samples: Optional[int] = None) -> Dict:
         """
@@ -357,11 +1182,8 @@ class ENACfDNADownloader:
         """
         self.logger.info(f"Starting download for project: {project_accession}")
         
-        # Get project samples
-        samples = self.get_project_samples(project_accession)
-        
-        if max_samples:
-            samples = samples[:max_samples]
+        # Get project samples, stopping the stream early if limited
+        samples = list(itertools.islice(self.get_project_samples(project_accession), max_samples or None))
         
         download_summary = {
             'project_accession': project_accession,
@@ -374,56 +1196,89 @@ class ENACfDNADownloader:
         }
         
         # Save project metadata
-        metadata_file = Path(self.storage_config["cfdna_structure"]["metadata"]) / f"{project_accession}_metadata.json"
-        with open(metadata_file, 'w') as f:
-            json.dump({
-                'project_accession': project_accession,
-                'samples': samples,
-                'download_date': time.strftime('%Y-%m-%d %H:%M:%S')
-            }, f, indent=2)
-        
-        # Download data for each sample
+        metadata_file = self._metadata_dir / f"{project_accession}_metadata.json"
+        dump_json({
+            'project_accession': project_accession,
+            'samples': samples,
+            'download_date': time.strftime('%Y-%m-%d %H:%M:%S')
+        }, metadata_file, indent=True)
+        
+        # Fetch run and file metadata for the whole project in one request
+        project_runs = self.get_project_filereport(project_accession)
+        sample_runs = {}
+        missing_samples = []
         for sample in samples:
-            try:
-                runs = self.get_sample_runs(sample['accession'])
+            runs = project_runs.get(sample['accession'])
+            if runs:
+                sample_runs[sample['accession']] = runs
+            else:
+                missing_samples.append(sample['accession'])
+        
+        # Fall back to concurrent per-sample lookups for samples absent from the report
+        with ThreadPoolExecutor(max_workers=self.download_config["parallel_samples"]) as executor:
+            future_to_sample = {
+                executor.submit(lambda accession: list(self.get_sample_runs(accession)), sample_accession): sample_accession
+                for sample_accession in missing_samples
+            }
+            
+            for future in as_completed(future_to_sample):
+                sample_accession = future_to_sample[future]
+                try:
+                    runs = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error processing sample {sample_accession}: {e}")
+                    download_summary['failed_samples'] += 1
+                    download_summary['errors'].append(f"Error processing sample {sample_accession}: {str(e)}")
+                    continue
                 
                 if not runs:
                     download_summary['failed_samples'] += 1
-                    download_summary['errors'].append(f"No runs found for sample {sample['accession']}")
+                    download_summary['errors'].append(f"No runs found for sample {sample_accession}")
                     continue
                 
-                sample_success = True
-                
-                # Download FASTQ files for each run
+                sample_runs[sample_accession] = runs
+        
+        # Download FASTQ files for all runs using thread pool
+        sample_success = {sample_accession: True for sample_accession in sample_runs}
+        with ThreadPoolExecutor(max_workers=self.download_config["parallel_downloads"]) as executor:
+            future_to_sample = {}
+            for sample_accession, runs in sample_runs.items():
                 for run in runs:
                     for file_info in run['files']:
                         if file_info['filetype'] in ['fastq', 'fastq.gz']:
-                            success = self.download_fastq_file(
-                                run['accession'], 
-                                file_info['filename'], 
+                            future = executor.submit(
+                                self.download_fastq_file,
+                                run['accession'],
+                                file_info['filename'],
                                 file_info
                             )
-                            
-                            if success:
-                                download_summary['downloaded_files'] += 1
-                            else:
-                                download_summary['failed_files'] += 1
-                                sample_success = False
+                            future_to_sample[future] = sample_accession
+            
+            # Counters are only updated here, on the submitting thread
+            for future in as_completed(future_to_sample):
+                sample_accession = future_to_sample[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error processing sample {sample_accession}: {e}")
+                    download_summary['errors'].append(f"Error processing sample {sample_accession}: {str(e)}")
+                    success = False
                 
-                if sample_success:
-                    download_summary['downloaded_samples'] += 1
+                if success:
+                    download_summary['downloaded_files'] += 1
                 else:
-                    download_summary['failed_samples'] += 1
-                    
-            except Exception as e:
-                self.logger.error(f"Error processing sample {sample['accession']}: {e}")
+                    download_summary['failed_files'] += 1
+                    sample_success[sample_accession] = False
+        
+        for success in sample_success.values():
+            if success:
+                download_summary['downloaded_samples'] += 1
+            else:
                 download_summary['failed_samples'] += 1
-                download_summary['errors'].append(f"Error processing sample {sample['accession']}: {str(e)}")
         
         # Save download summary
-        summary_file = Path(self.storage_config["cfdna_structure"]["metadata"]) / f"{project_accession}_download_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(download_summary, f, indent=2)
+        summary_file = self._metadata_dir / f"{project_accession}_download_summary.json"
+        dump_json(download_summary, summary_file, indent=True)
         
         self.logger.info(f"Download completed for project {project_accession}")
         self.logger.info(f"Summary: {download_summary['downloaded_samples']}/{download_summary['total_samples']} samples downloaded")
@@ -449,19 +1304,23 @@ def main():
     
     if args.search:
         # Search for cfDNA projects
-        projects = downloader.search_cfdna_projects(args.keywords)
-        print(f"Found {len(projects)} cfDNA projects:")
-        for project in projects:
+        project_count = 0
+        for project in downloader.search_cfdna_projects(args.keywords):
             print(f"  {project['accession']}: {project['title']}")
+            project_count += 1
+        print(f"Found {project_count} cfDNA projects")
     
     elif args.project:
         # Download specific project
+        downloader.crawl_metadata([args.project], args.max_samples)
         summary = downloader.download_project_data(args.project, args.max_samples)
         print(f"Download summary: {summary}")
     
     else:
         # Download all configured projects
-        for project in downloader.config["cfdna_datasets"]["ena_datasets"]:
+        projects = downloader.config["cfdna_datasets"]["ena_datasets"]
+        downloader.crawl_metadata([project["accession"] for project in projects], args.max_samples)
+        for project in projects:
             summary = downloader.download_project_data(project["accession"], args.max_samples)
             print(f"Download summary for {project['accession']}: {summary}")
 
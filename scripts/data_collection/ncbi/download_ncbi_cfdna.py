@@ -4,19 +4,154 @@ NCBI cfDNA WGS Data Downloader
 Downloads cfDNA Whole Genome Sequencing data from NCBI SRA using sra-tools
 """
 
+import io
 import os
 import sys
 import yaml
 import json
 import logging
+import sqlite3
 import requests
-import subprocess
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
-import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict, deque
+from typing import Dict, Iterator, List, Optional
 import time
 
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader
+    LIBYAML_AVAILABLE = False
+
+# Response statuses retried with backoff by both the sync and async clients
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# esummary DocSum Item names mapped to project and run metadata fields
+_PROJECT_FIELD_MAP = {
+    'Accession': 'accession',
+    'Title': 'title',
+    'Summary': 'description',
+    'SubmissionDate': 'submission_date',
+    'CenterName': 'center_name',
+    'SampleCount': 'sample_count'
+}
+
+_RUN_FIELD_MAP = {
+    'Accession': 'accession',
+    'Title': 'title',
+    'Platform': 'instrument_platform',
+    'Model': 'instrument_model',
+    'Bases': 'base_count',
+    'Spots': 'read_count',
+    'RunDate': 'run_date',
+    'SampleAcc': 'sample_accession',
+    'ExperimentAcc': 'experiment_accession',
+    'StudyAcc': 'study_accession'
+}
+
+# esearch filters from the config mapped to their SRA search fields
+_FILTER_FIELDS = {
+    'strategy': 'Strategy',
+    'layout': 'Layout',
+    'platform': 'Platform'
+}
+
+# Metadata fields holding counts
+_INT_FIELDS = frozenset({'base_count', 'read_count', 'sample_count'})
+
+_PROJECT_TEMPLATE = {
+    'accession': '',
+    'title': '',
+    'description': '',
+    'submission_date': '',
+    'center_name': '',
+    'sample_count': 0
+}
+
+_RUN_TEMPLATE = {
+    'accession': '',
+    'title': '',
+    'instrument_platform': '',
+    'instrument_model': '',
+    'base_count': 0,
+    'read_count': 0,
+    'run_date': '',
+    'sample_accession': '',
+    'experiment_accession': '',
+    'study_accession': ''
+}
+
+
+def dumps_json(obj, indent: bool = False) -> bytes:
+    """Serialize an object to JSON bytes, using orjson if available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def loads_json(data):
+    """Deserialize JSON bytes or text, using orjson if available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _RequestLimiter:
+    """
+    Bound concurrent requests and space their starts with a shared rate budget
+    
+    Used as ``async with limiter:`` around each request from one event loop;
+    ``reserve`` returns the seconds to wait for the next free start slot.
+    """
+    
+    def __init__(self, max_concurrent: int, reserve):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._reserve = reserve
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        
+        # Reserve the next start slot before sleeping so waiters queue in order
+        try:
+            await asyncio.sleep(self._reserve())
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
 
 class NCBICfDNADownloader:
     """Download cfDNA WGS data from NCBI SRA"""
@@ -28,23 +163,117 @@ class NCBICfDNADownloader:
         self.storage_config = self.config["storage"]
         self.download_config = self.config["download_settings"]
         
+        # Resolve frequently used settings once
+        cfdna_structure = self.storage_config["cfdna_structure"]
+        self._fastq_dir = Path(cfdna_structure["fastq"])
+        self._bam_dir = Path(cfdna_structure["bam"])
+        self._metadata_dir = Path(cfdna_structure["metadata"])
+        self._qc_dir = Path(cfdna_structure["qc_reports"])
+        self._frag_dir = Path(cfdna_structure["fragmentomics"])
+        self._sra_dir = Path(cfdna_structure["sra"])
+        self._ncbi_base = self.ncbi_config["base_url"]
+        self._ncbi_timeout = self.ncbi_config["timeout"]
+        self._max_concurrent = self.download_config["max_concurrent_downloads"]
+        self._transfer_timeout = self.download_config["sra_transfer_timeout"]
+        
+        # NCBI allows 3 E-utilities requests per second, or 10 with an API key
+        self._api_key = self.ncbi_config.get("api_key") or os.environ.get("NCBI_API_KEY")
+        self._ncbi_rate = 10 if self._api_key else 3
+        
+        # Start time of the next E-utilities request, shared by sync and async requests
+        self._next_request = 0.0
+        self._rate_lock = threading.Lock()
+        
+        # Split the cores between concurrent fasterq-dump processes
+        self._per_run_threads = max(1, (os.cpu_count() or 1) // self._max_concurrent)
+        
         # Setup logging
         self._setup_logging()
         
+        if not LIBYAML_AVAILABLE:
+            self.logger.warning("libyaml not available, config parsed with the pure-Python loader; "
+                                "install it with: pip install pyyaml[libyaml]")
+        
         # Create directories
         self._create_directories()
         
+        # Persistent cache of parsed esummary records
+        self._details_cache = sqlite3.connect(self.storage_config["metadata_cache_db"])
+        self._details_cache.execute(
+            "CREATE TABLE IF NOT EXISTS esummary("
+            "db TEXT, parser TEXT, id TEXT, payload BLOB, fetched_at INTEGER, "
+            "PRIMARY KEY(db, parser, id))"
+        )
+        
+        # Index of completed run downloads
+        self._done = sqlite3.connect(self.storage_config["download_index_db"],
+                                     isolation_level=None, check_same_thread=False)
+        self._done.execute("PRAGMA journal_mode=WAL")
+        self._done.execute("CREATE TABLE IF NOT EXISTS done(acc TEXT PRIMARY KEY, files TEXT)")
+        self._done_lock = threading.Lock()
+        
         # Initialize session
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'FragmentFusion-DataCollector/1.0'
+            'User-Agent': 'FragmentFusion-DataCollector/1.0',
+            'Accept-Encoding': 'gzip, deflate'
         })
         
+        # Pool connections and retry throttled or failed E-utilities requests
+        # (esummary POSTs are read-only, so they are safe to retry as well)
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=self.ncbi_config["max_retries"],
+                backoff_factor=0.5,
+                status_forcelist=_RETRY_STATUSES,
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'}
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if self._api_key:
+            self.session.params = {'api_key': self._api_key}
+        
+        # Precompiled XPath query (lxml if available)
+        self._xp_items = self._compile_xpath('.//Item')
+        
+    @staticmethod
+    def _compile_xpath(path: str):
+        """Compile an XPath query, falling back to findall for stdlib ElementTree"""
+        if LXML_AVAILABLE:
+            return ET.XPath(path)
+        return lambda elem: elem.findall(path)
+    
+    def _iterparse(self, source, tag: str):
+        """
+        Stream-parse an XML body, yielding each completed element with the given tag
+        
+        Elements are cleared (together with already processed siblings under lxml)
+        once the caller moves on, so memory stays bounded by a single record.
+        """
+        if LXML_AVAILABLE:
+            context = ET.iterparse(source, events=('end',), tag=tag, huge_tree=True, recover=True)
+        else:
+            context = ET.iterparse(source, events=('end',))
+        
+        for _, elem in context:
+            if elem.tag != tag:
+                continue
+            
+            yield elem
+            
+            elem.clear()
+            if LXML_AVAILABLE:
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration file"""
         try:
             with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=SafeLoader)
         except Exception as e:
             raise ValueError(f"Failed to load config {config_path}: {e}")
     
@@ -66,11 +295,12 @@ class NCBICfDNADownloader:
     def _create_directories(self):
         """Create necessary directories"""
         dirs = [
-            self.storage_config["cfdna_structure"]["fastq"],
-            self.storage_config["cfdna_structure"]["bam"],
-            self.storage_config["cfdna_structure"]["metadata"],
-            self.storage_config["cfdna_structure"]["qc_reports"],
-            self.storage_config["cfdna_structure"]["fragmentomics"],
+            self._fastq_dir,
+            self._bam_dir,
+            self._metadata_dir,
+            self._qc_dir,
+            self._frag_dir,
+            self._sra_dir,
             self.storage_config["logs"]
         ]
         
@@ -91,105 +321,394 @@ class NCBICfDNADownloader:
         if keywords is None:
             keywords = ["cfDNA", "cell-free DNA", "liquid biopsy", "WGS", "whole genome"]
         
+        # Collect IDs for every keyword first so each project is fetched once
+        id_keywords = {}
+        for keyword, ids in self._search_keywords(keywords).items():
+            for project_id in ids:
+                id_keywords.setdefault(project_id, []).append(keyword)
+        
+        # Get project details
         projects = []
+        for project in self._get_details_batch(list(id_keywords), self._parse_project):
+            project['keywords'] = id_keywords.get(project['id'], [])
+            projects.append(project)
+        
+        self.logger.info(f"Found {len(projects)} cfDNA projects")
+        return projects
+    
+    def _search_keywords(self, keywords: List[str]) -> Dict[str, List[str]]:
+        """
+        Run one esearch per keyword, concurrently if httpx is installed
         
-        for keyword in keywords:
-            self.logger.info(f"Searching NCBI SRA for projects with keyword: {keyword}")
+        Args:
+            keywords: List of search keywords
             
-            # NCBI E-utilities search
-            search_url = f"{self.ncbi_config['base_url']}/esearch.fcgi"
-            params = {
-                'db': 'sra',
-                'term': f'"{keyword}"[Title/Abstract] AND "WGS"[Strategy]',
-                'retmode': 'xml',
-                'retmax': 1000
+        Returns:
+            Matching NCBI IDs keyed by keyword
+        """
+        if HTTPX_AVAILABLE and len(keywords) > 1:
+            return asyncio.run(self._asearch_keywords(keywords))
+        
+        return {keyword: self._esearch(keyword) for keyword in keywords}
+    
+    def _esearch_params(self, keyword: str) -> Dict:
+        """Get the esearch parameters for a keyword search"""
+        return {
+            'db': 'sra',
+            'term': self._build_term(keyword),
+            'retmode': 'json',
+            'retmax': 1000
+        }
+    
+    def _build_term(self, keyword: str) -> str:
+        """
+        Build the esearch term for a keyword with the configured filters applied
+        
+        Filtering at NCBI keeps records that would be discarded anyway out of the
+        ID list, and so out of the esummary requests.
+        
+        Args:
+            keyword: Search keyword
+            
+        Returns:
+            Entrez query, e.g. '"cfDNA"[Title/Abstract] AND "WGS"[Strategy] AND ...'
+        """
+        filters = self.ncbi_config["filters"]
+        
+        clauses = [f'"{keyword}"[Title/Abstract]']
+        clauses.extend(
+            f'"{filters[key]}"[{field}]'
+            for key, field in _FILTER_FIELDS.items()
+            if filters.get(key)
+        )
+        
+        if filters.get('publication_date'):
+            start, end = filters['publication_date']
+            clauses.append(f'("{start}"[PDAT] : "{end}"[PDAT])')
+        
+        return ' AND '.join(clauses)
+    
+    def _esearch(self, keyword: str) -> List[str]:
+        """
+        Search NCBI SRA for one keyword
+        
+        Args:
+            keyword: Search keyword
+            
+        Returns:
+            Matching NCBI IDs, or an empty list on error
+        """
+        self.logger.info(f"Searching NCBI SRA for projects with keyword: {keyword}")
+        
+        # NCBI E-utilities search
+        search_url = f"{self._ncbi_base}/esearch.fcgi"
+        
+        try:
+            self._throttle()
+            response = self.session.get(search_url, params=self._esearch_params(keyword), timeout=self._ncbi_timeout)
+            response.raise_for_status()
+            
+            # Parse JSON response
+            return loads_json(response.content)['esearchresult']['idlist']
+            
+        except Exception as e:
+            self.logger.error(f"Error searching for keyword '{keyword}': {e}")
+            return []
+    
+    async def _asearch_keywords(self, keywords: List[str]) -> Dict[str, List[str]]:
+        """Run the keyword searches concurrently over one async client"""
+        limiter = self._request_limiter()
+        
+        async with self._async_client() as client:
+            results = await asyncio.gather(*(
+                self._aesearch(client, limiter, keyword)
+                for keyword in keywords
+            ))
+        
+        return dict(zip(keywords, results))
+    
+    async def _aesearch(self, client, limiter, keyword: str) -> List[str]:
+        """
+        Search NCBI SRA for one keyword
+        
+        Args:
+            client: httpx.AsyncClient to issue the request with
+            limiter: Limiter bounding concurrent requests and their rate
+            keyword: Search keyword
+            
+        Returns:
+            Matching NCBI IDs, or an empty list on error
+        """
+        self.logger.info(f"Searching NCBI SRA for projects with keyword: {keyword}")
+        
+        search_url = f"{self._ncbi_base}/esearch.fcgi"
+        
+        try:
+            response = await self._arequest(client, limiter, 'GET', search_url, params=self._esearch_params(keyword))
+            
+            return loads_json(response.content)['esearchresult']['idlist']
+            
+        except Exception as e:
+            self.logger.error(f"Error searching for keyword '{keyword}': {e}")
+            return []
+    
+    def _async_client(self):
+        """Create an HTTP/2-capable async client for concurrent E-utilities requests"""
+        transport = httpx.AsyncHTTPTransport(
+            http2=H2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            retries=self.ncbi_config["max_retries"]
+        )
+        
+        return httpx.AsyncClient(
+            transport=transport,
+            headers={'User-Agent': self.session.headers['User-Agent']},
+            params={'api_key': self._api_key} if self._api_key else None,
+            timeout=self._ncbi_timeout
+        )
+    
+    def _request_limiter(self) -> _RequestLimiter:
+        """Create a limiter for the E-utilities requests of one event loop run"""
+        return _RequestLimiter(self.ncbi_config["max_concurrent_requests"], self._reserve_request)
+    
+    def _reserve_request(self) -> float:
+        """
+        Reserve the start of the next E-utilities request under the NCBI rate limit
+        
+        Every request made by this downloader, sync or async and across event
+        loops, reserves its start here so they all share one budget.
+        
+        Returns:
+            Seconds to wait before sending the request
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + 1.0 / self._ncbi_rate
+        return start - now
+    
+    def _throttle(self):
+        """Wait for the next E-utilities request slot before a sync request"""
+        time.sleep(self._reserve_request())
+    
+    async def _arequest(self, client, limiter: _RequestLimiter, method: str, url: str, **kwargs):
+        """
+        Issue an E-utilities request within the rate limit, retrying throttled
+        and failed responses
+        
+        httpx transports only retry failed connections, so 429 and 5xx responses
+        are retried here with the backoff the sync session uses, waiting for
+        Retry-After when the server sends it.
+        
+        Args:
+            client: httpx.AsyncClient to issue the request with
+            limiter: Limiter bounding concurrent requests and their rate
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed on to client.request
+            
+        Returns:
+            Successful httpx.Response
+        """
+        retries = self.ncbi_config["max_retries"]
+        
+        for attempt in range(retries + 1):
+            async with limiter:
+                response = await client.request(method, url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES or attempt == retries:
+                break
+            await asyncio.sleep(self._retry_delay(response, attempt))
+        
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _retry_delay(response, attempt: int) -> float:
+        """Get the seconds to wait before retrying a response, honouring Retry-After"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        return 0.5 * (2 ** attempt)
+    
+    def _get_details_batch(self, ids: List[str], parse, db: str = 'sra') -> Iterator[Dict]:
+        """
+        Get esummary records for many IDs with one request per batch
+        
+        Records already in the metadata cache are returned from there and only the
+        remaining IDs are requested. With httpx installed, several batches are
+        requested concurrently from one asyncio event loop; otherwise they are
+        streamed one after another.
+        
+        Args:
+            ids: NCBI IDs to summarise
+            parse: Callable turning a DocSum element into a metadata dict
+            db: Entrez database
+            
+        Yields:
+            Metadata for each DocSum returned, in the order of ids
+        """
+        summary_url = f"{self._ncbi_base}/esummary.fcgi"
+        batch_size = self.ncbi_config["esummary_batch_size"]
+        
+        records = self._lookup_details_cache(db, parse.__name__, ids)
+        
+        missing_ids = [record_id for record_id in ids if record_id not in records]
+        batches = [missing_ids[start:start + batch_size] for start in range(0, len(missing_ids), batch_size)]
+        
+        if HTTPX_AVAILABLE and len(batches) > 1:
+            fetched = asyncio.run(self._aget_details_batches(summary_url, batches, parse, db))
+            self._store_details_cache(db, parse.__name__, fetched)
+            records.update((record['id'], record) for record in fetched)
+            batches = []
+        
+        for batch in batches:
+            data = {
+                'db': db,
+                'id': ','.join(batch),
+                'retmode': 'xml'
             }
             
             try:
-                response = self.session.get(search_url, params=params, timeout=self.ncbi_config["timeout"])
-                response.raise_for_status()
+                # POST keeps long ID lists out of the URL
+                self._throttle()
+                with self.session.post(summary_url, data=data, stream=True, timeout=self._ncbi_timeout) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    
+                    fetched = [parse(doc_sum) for doc_sum in self._iterparse(response.raw, 'DocSum')]
                 
-                # Parse XML response
-                root = ET.fromstring(response.content)
+                self._store_details_cache(db, parse.__name__, fetched)
+                records.update((record['id'], record) for record in fetched)
                 
-                # Get IDs
-                id_list = root.find('.//IdList')
-                if id_list is not None:
-                    for id_elem in id_list.findall('Id'):
-                        project_id = id_elem.text
-                        
-                        # Get project details
-                        project_details = self._get_project_details(project_id)
-                        if project_details:
-                            project_details['keyword'] = keyword
-                            projects.append(project_details)
-                    
             except Exception as e:
-                self.logger.error(f"Error searching for keyword '{keyword}': {e}")
-                continue
+                self.logger.error(f"Error getting details for {len(batch)} IDs starting at {batch[0]}: {e}")
         
-        self.logger.info(f"Found {len(projects)} cfDNA projects")
-        return projects
+        # Cached records come back in key order; keep the order of the search results
+        for record_id in ids:
+            if record_id in records:
+                yield records[record_id]
+    
+    def _lookup_details_cache(self, db: str, parser: str, ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get cached esummary records younger than the cache TTL
+        
+        Args:
+            db: Entrez database
+            parser: Name of the parser that produced the records
+            ids: NCBI IDs to look up
+            
+        Returns:
+            Cached metadata keyed by ID
+        """
+        cache_config = self.ncbi_config["metadata_cache"]
+        if not cache_config["enabled"]:
+            return {}
+        
+        min_fetched_at = int(time.time()) - cache_config["ttl"]
+        batch_size = self.ncbi_config["esummary_batch_size"]
+        cached = {}
+        
+        # Look up in slices to stay below SQLite's bound parameter limit
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            rows = self._details_cache.execute(
+                "SELECT id, payload FROM esummary WHERE db = ? AND parser = ? AND fetched_at >= ? "
+                f"AND id IN ({','.join('?' * len(batch))})",
+                [db, parser, min_fetched_at, *batch]
+            )
+            for record_id, payload in rows:
+                cached[record_id] = loads_json(payload)
+        
+        return cached
+    
+    def _store_details_cache(self, db: str, parser: str, records: List[Dict]):
+        """Store parsed esummary records in the metadata cache"""
+        if not self.ncbi_config["metadata_cache"]["enabled"] or not records:
+            return
+        
+        fetched_at = int(time.time())
+        with self._details_cache:
+            self._details_cache.executemany(
+                "INSERT OR REPLACE INTO esummary VALUES (?, ?, ?, ?, ?)",
+                [(db, parser, record['id'], dumps_json(record), fetched_at) for record in records]
+            )
+    
+    async def _aget_details_batches(self, summary_url: str, batches: List[List[str]], parse, db: str) -> List[Dict]:
+        """Fetch esummary batches concurrently over one async client"""
+        limiter = self._request_limiter()
+        
+        async with self._async_client() as client:
+            results = await asyncio.gather(*(
+                self._aget_details(client, limiter, summary_url, batch, parse, db)
+                for batch in batches
+            ))
+        
+        return [record for records in results for record in records]
     
-    def _get_project_details(self, project_id: str) -> Optional[Dict]:
+    async def _aget_details(self, client, limiter, summary_url: str, batch: List[str], parse, db: str) -> List[Dict]:
         """
-        Get detailed information about a project
+        Fetch and parse one esummary batch
         
         Args:
-            project_id: NCBI project ID
+            client: httpx.AsyncClient to issue the request with
+            limiter: Limiter bounding concurrent requests and their rate
+            summary_url: esummary endpoint
+            batch: NCBI IDs to summarise
+            parse: Callable turning a DocSum element into a metadata dict
+            db: Entrez database
             
         Returns:
-            Project metadata or None if not found
+            Metadata for each DocSum returned, or an empty list on error
         """
+        data = {
+            'db': db,
+            'id': ','.join(batch),
+            'retmode': 'xml'
+        }
+        
         try:
-            # Get project summary
-            summary_url = f"{self.ncbi_config['base_url']}/esummary.fcgi"
-            params = {
-                'db': 'sra',
-                'id': project_id,
-                'retmode': 'xml'
-            }
+            response = await self._arequest(client, limiter, 'POST', summary_url, data=data)
             
-            response = self.session.get(summary_url, params=params, timeout=self.ncbi_config["timeout"])
-            response.raise_for_status()
+            return [parse(doc_sum) for doc_sum in self._iterparse(io.BytesIO(response.content), 'DocSum')]
             
-            root = ET.fromstring(response.content)
-            
-            # Extract project information
-            doc_sum = root.find('.//DocSum')
-            if doc_sum is not None:
-                project = {
-                    'id': project_id,
-                    'accession': '',
-                    'title': '',
-                    'description': '',
-                    'submission_date': '',
-                    'center_name': '',
-                    'sample_count': 0
-                }
-                
-                for item in doc_sum.findall('.//Item'):
-                    name = item.get('Name')
-                    value = item.text
-                    
-                    if name == 'Accession':
-                        project['accession'] = value
-                    elif name == 'Title':
-                        project['title'] = value
-                    elif name == 'Summary':
-                        project['description'] = value
-                    elif name == 'SubmissionDate':
-                        project['submission_date'] = value
-                    elif name == 'CenterName':
-                        project['center_name'] = value
-                    elif name == 'SampleCount':
-                        project['sample_count'] = int(value) if value else 0
-                
-                return project
-                
         except Exception as e:
-            self.logger.error(f"Error getting project details for {project_id}: {e}")
-            return None
+            self.logger.error(f"Error getting details for {len(batch)} IDs starting at {batch[0]}: {e}")
+            return []
+    
+    def _parse_project(self, doc_sum) -> Dict:
+        """
+        Extract project information from an esummary DocSum element
+        
+        Args:
+            doc_sum: DocSum element
+            
+        Returns:
+            Project metadata
+        """
+        return self._parse_docsum(doc_sum, _PROJECT_FIELD_MAP, _INT_FIELDS, _PROJECT_TEMPLATE)
+    
+    def _parse_docsum(self, doc_sum, field_map: Dict[str, str], int_fields: frozenset, template: Dict) -> Dict:
+        """
+        Extract metadata from an esummary DocSum element
+        
+        Args:
+            doc_sum: DocSum element
+            field_map: DocSum Item names mapped to metadata fields
+            int_fields: Metadata fields to convert to integers
+            template: Default value of every metadata field
+            
+        Returns:
+            Metadata with the DocSum ID and the mapped Item values
+        """
+        record = {'id': doc_sum.findtext('Id'), **template}
+        
+        for item in self._xp_items(doc_sum):
+            field = field_map.get(item.get('Name'))
+            if field:
+                value = item.text
+                record[field] = (int(value) if value else 0) if field in int_fields else value
+        
+        return record
     
     def get_project_runs(self, project_accession: str) -> List[Dict]:
         """
@@ -204,33 +723,26 @@ class NCBICfDNADownloader:
         self.logger.info(f"Getting runs for project: {project_accession}")
         
         # Search for runs in the project
-        search_url = f"{self.ncbi_config['base_url']}/esearch.fcgi"
+        search_url = f"{self._ncbi_base}/esearch.fcgi"
         params = {
             'db': 'sra',
             'term': f'{project_accession}[Project]',
-            'retmode': 'xml',
+            'retmode': 'json',
             'retmax': 10000
         }
         
         try:
-            response = self.session.get(search_url, params=params, timeout=self.ncbi_config["timeout"])
+            self._throttle()
+            response = self.session.get(search_url, params=params, timeout=self._ncbi_timeout)
             response.raise_for_status()
             
-            root = ET.fromstring(response.content)
+            result = loads_json(response.content)['esearchresult']
             
             # Get run IDs
-            id_list = root.find('.//IdList')
-            if id_list is None:
-                return []
-            
-            run_ids = [id_elem.text for id_elem in id_list.findall('Id')]
+            run_ids = result['idlist']
             
-            # Get details for each run
-            runs = []
-            for run_id in run_ids:
-                run_details = self._get_run_details(run_id)
-                if run_details:
-                    runs.append(run_details)
+            # Get details for all runs in batches
+            runs = list(self._get_details_batch(run_ids, self._parse_run))
             
             self.logger.info(f"Found {len(runs)} runs in project {project_accession}")
             return runs
@@ -239,140 +751,251 @@ class NCBICfDNADownloader:
             self.logger.error(f"Error getting runs for project {project_accession}: {e}")
             return []
     
-    def _get_run_details(self, run_id: str) -> Optional[Dict]:
+    def _parse_run(self, doc_sum) -> Dict:
         """
-        Get detailed information about a run
+        Extract run information from an esummary DocSum element
         
         Args:
-            run_id: NCBI run ID
+            doc_sum: DocSum element
             
         Returns:
-            Run metadata or None if not found
+            Run metadata
         """
-        try:
-            # Get run summary
-            summary_url = f"{self.ncbi_config['base_url']}/esummary.fcgi"
-            params = {
-                'db': 'sra',
-                'id': run_id,
-                'retmode': 'xml'
-            }
-            
-            response = self.session.get(summary_url, params=params, timeout=self.ncbi_config["timeout"])
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            
-            # Extract run information
-            doc_sum = root.find('.//DocSum')
-            if doc_sum is not None:
-                run = {
-                    'id': run_id,
-                    'accession': '',
-                    'title': '',
-                    'instrument_platform': '',
-                    'instrument_model': '',
-                    'base_count': 0,
-                    'read_count': 0,
-                    'run_date': '',
-                    'sample_accession': '',
-                    'experiment_accession': '',
-                    'study_accession': ''
-                }
-                
-                for item in doc_sum.findall('.//Item'):
-                    name = item.get('Name')
-                    value = item.text
-                    
-                    if name == 'Accession':
-                        run['accession'] = value
-                    elif name == 'Title':
-                        run['title'] = value
-                    elif name == 'Platform':
-                        run['instrument_platform'] = value
-                    elif name == 'Model':
-                        run['instrument_model'] = value
-                    elif name == 'Bases':
-                        run['base_count'] = int(value) if value else 0
-                    elif name == 'Spots':
-                        run['read_count'] = int(value) if value else 0
-                    elif name == 'RunDate':
-                        run['run_date'] = value
-                    elif name == 'SampleAcc':
-                        run['sample_accession'] = value
-                    elif name == 'ExperimentAcc':
-                        run['experiment_accession'] = value
-                    elif name == 'StudyAcc':
-                        run['study_accession'] = value
-                
-                return run
-                
-        except Exception as e:
-            self.logger.error(f"Error getting run details for {run_id}: {e}")
-            return None
+        return self._parse_docsum(doc_sum, _RUN_FIELD_MAP, _INT_FIELDS, _RUN_TEMPLATE)
     
-    def download_sra_run(self, run_accession: str) -> bool:
+    def download_sra_run(self, run_accession: str, existing_files: Optional[List[Path]] = None) -> List[Path]:
         """
         Download a SRA run using sra-tools
         
         Args:
             run_accession: SRA run accession
+            existing_files: FASTQ files of the run already on disk, e.g. from
+                _snapshot_fastq_files; the output directory is globbed if not given
+            
+        Returns:
+            FASTQ files of the run, or an empty list if the download failed
+        """
+        return asyncio.run(self._adownload_sra_run(run_accession, existing_files))
+    
+    async def _adownload_sra_run(self, run_accession: str, existing_files: Optional[List[Path]] = None,
+                                 prefetch_semaphore: Optional[asyncio.Semaphore] = None) -> List[Path]:
+        """
+        Download a SRA run with a fasterq-dump subprocess driven by the event loop
+        
+        A run whose .sra file is in the local SRA cache is converted from there
+        instead of being streamed from NCBI.
+        
+        Args:
+            run_accession: SRA run accession
+            existing_files: FASTQ files of the run already on disk, e.g. from
+                _snapshot_fastq_files; the output directory is globbed if not given
+            prefetch_semaphore: If given, the .sra file is prefetched first, with
+                the semaphore bounding concurrent transfers
             
         Returns:
-            True if download successful, False otherwise
+            FASTQ files of the run, or an empty list if the download failed
         """
         self.logger.info(f"Downloading SRA run: {run_accession}")
         
         # Set output directory
-        output_dir = Path(self.storage_config["cfdna_structure"]["fastq"])
+        output_dir = self._fastq_dir
         
         # Check if already downloaded
-        fastq_files = list(output_dir.glob(f"{run_accession}*.fastq*"))
+        fastq_files = self._get_downloaded_files(run_accession)
         if fastq_files:
             self.logger.info(f"Run {run_accession} already downloaded")
-            return True
+            return fastq_files
+        
+        # Files from before the download index existed
+        if existing_files is None:
+            existing_files = list(output_dir.glob(f"{run_accession}*.fastq*"))
+        if existing_files:
+            self.logger.info(f"Run {run_accession} already downloaded")
+            self._mark_downloaded(run_accession, existing_files)
+            return existing_files
+        
+        # Fetch the .sra file over parallel connections first if requested
+        if prefetch_semaphore is not None:
+            async with prefetch_semaphore:
+                await self._aprefetch_sra_run(run_accession)
+        
+        sra_file = self._cached_sra_file(run_accession)
         
         # Download using fasterq-dump
         cmd = [
             'fasterq-dump',
             '--outdir', str(output_dir),
-            '--threads', str(self.download_config["max_concurrent_downloads"]),
+            '--threads', str(self._per_run_threads),
+            '--bufsize', self.download_config["fasterq_bufsize"],
+            '--mem', self.download_config["fasterq_mem"],
             '--split-files',  # For paired-end reads
             '--skip-technical',  # Skip technical reads
             '--min-read-len', str(self.config["quality_filters"]["min_read_length"]),
-            run_accession
+            str(sra_file) if sra_file is not None else run_accession
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.ncbi_config["timeout"])
+            returncode, _, stderr_tail = await self._arun(cmd, run_accession, self._ncbi_timeout)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 # Check if files were created
                 fastq_files = list(output_dir.glob(f"{run_accession}*.fastq*"))
                 if fastq_files:
                     self.logger.info(f"Successfully downloaded run {run_accession}: {len(fastq_files)} files")
-                    return True
+                    self._mark_downloaded(run_accession, fastq_files)
+                    
+                    # The converted FASTQ files replace the prefetched .sra file
+                    if sra_file is not None:
+                        sra_file.unlink()
+                    return fastq_files
                 else:
                     self.logger.error(f"No FASTQ files created for run {run_accession}")
-                    return False
+                    return []
             else:
-                self.logger.error(f"Download failed for run {run_accession}: {result.stderr}")
-                return False
+                self.logger.error(f"Download failed for run {run_accession}: {stderr_tail}")
+                return []
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             self.logger.error(f"Download timeout for run {run_accession}")
-            return False
+            return []
         except Exception as e:
             self.logger.error(f"Error downloading run {run_accession}: {e}")
-            return False
+            return []
     
-    def download_project_data(self, project_accession: str, max_runs: Optional[int] = None) -> Dict:
+    async def _arun(self, cmd: List[str], run_accession: str, timeout: Optional[float]):
+        """
+        Run an external tool for a run, logging its stderr as it is written
+        
+        The process is killed if it outlives the timeout.
+        
+        Args:
+            cmd: Command and arguments
+            run_accession: SRA run accession the tool works on
+            timeout: Seconds the tool may run for (None for no limit)
+            
+        Returns:
+            Tuple of the return code, stdout and the last lines of stderr
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        try:
+            stdout, stderr_tail = await asyncio.wait_for(
+                asyncio.gather(process.stdout.read(), self._log_stderr(process, run_accession)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        
+        return process.returncode, stdout.decode(errors='replace'), stderr_tail
+    
+    async def _log_stderr(self, process, run_accession: str) -> str:
+        """
+        Forward the stderr of a subprocess to the debug log and wait for it to exit
+        
+        Args:
+            process: asyncio subprocess with a piped stderr
+            run_accession: SRA run accession the process works on
+            
+        Returns:
+            The last lines of stderr, for error messages
+        """
+        tail = deque(maxlen=20)
+        
+        async for line in process.stderr:
+            line = line.decode(errors='replace').rstrip()
+            self.logger.debug(f"{run_accession}: {line}")
+            tail.append(line)
+        
+        await process.wait()
+        return '\n'.join(tail)
+    
+    async def _adownload_runs(self, run_accessions: List[str], existing_files: Dict[str, List[Path]],
+                              prefetch: bool = False) -> List:
+        """
+        Download several runs with at most max_concurrent_downloads fasterq-dump processes
+        
+        Args:
+            run_accessions: SRA run accessions
+            existing_files: FASTQ files already on disk keyed by run accession
+            prefetch: Prefetch .sra files (max_concurrent_prefetch at a time) before conversion
+            
+        Returns:
+            FASTQ files (or the exception raised) for each run, in order
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrent)
+        prefetch_semaphore = asyncio.Semaphore(self.download_config["max_concurrent_prefetch"]) if prefetch else None
+        
+        async def download(run_accession):
+            async with semaphore:
+                return await self._adownload_sra_run(run_accession, existing_files.get(run_accession, []),
+                                                     prefetch_semaphore)
+        
+        return await asyncio.gather(
+            *(download(run_accession) for run_accession in run_accessions),
+            return_exceptions=True
+        )
+    
+    def _get_downloaded_files(self, run_accession: str) -> List[Path]:
+        """
+        Look up the FASTQ files of a run in the download index
+        
+        Args:
+            run_accession: SRA run accession
+            
+        Returns:
+            FASTQ files of the run, or an empty list if it is not indexed or
+            any of its files has since been removed
+        """
+        with self._done_lock:
+            row = self._done.execute("SELECT files FROM done WHERE acc = ?", (run_accession,)).fetchone()
+        
+        if row is None:
+            return []
+        
+        fastq_files = [Path(file_path) for file_path in loads_json(row[0])]
+        return fastq_files if all(file_path.exists() for file_path in fastq_files) else []
+    
+    def _mark_downloaded(self, run_accession: str, fastq_files: List[Path]):
+        """Record the FASTQ files of a completed run in the download index"""
+        with self._done_lock:
+            self._done.execute(
+                "INSERT OR REPLACE INTO done VALUES (?, ?)",
+                (run_accession, dumps_json([str(file_path) for file_path in fastq_files]).decode())
+            )
+    
+    def _snapshot_fastq_files(self) -> Dict[str, List[Path]]:
+        """
+        List the FASTQ files already downloaded, in a single directory scan
+        
+        Returns:
+            FASTQ file paths keyed by run accession
+        """
+        fastq_files = defaultdict(list)
+        
+        with os.scandir(self._fastq_dir) as entries:
+            for entry in entries:
+                if '.fastq' in entry.name and entry.is_file():
+                    # fasterq-dump names files <run>.fastq or <run>_<read>.fastq
+                    run_accession = entry.name.split('_', 1)[0].split('.', 1)[0]
+                    fastq_files[run_accession].append(Path(entry.path))
+        
+        return fastq_files
+    
+    def download_project_data(self, project_accession: str, max_runs: Optional[int] = None,
+                              prefetch: bool = False) -> Dict:
         """
         Download all data for a specific project
         
         Args:
             project_accession: NCBI project accession
             max_runs: Maximum number of runs to download (None for all)
+            prefetch: Prefetch .sra files with parallel connections before conversion
             
         Returns:
             Download summary
@@ -396,45 +1019,38 @@ class NCBICfDNADownloader:
         }
         
         # Save project metadata
-        metadata_file = Path(self.storage_config["cfdna_structure"]["metadata"]) / f"{project_accession}_metadata.json"
-        with open(metadata_file, 'w') as f:
-            json.dump({
+        metadata_file = self._metadata_dir / f"{project_accession}_metadata.json"
+        with open(metadata_file, 'wb') as f:
+            f.write(dumps_json({
                 'project_accession': project_accession,
                 'runs': runs,
                 'download_date': time.strftime('%Y-%m-%d %H:%M:%S')
-            }, f, indent=2)
-        
-        # Download runs using thread pool
-        with ThreadPoolExecutor(max_workers=self.download_config["max_concurrent_downloads"]) as executor:
-            # Submit download tasks
-            future_to_run = {
-                executor.submit(self.download_sra_run, run['accession']): run['accession'] 
-                for run in runs
-            }
-            
-            # Process completed downloads
-            for future in as_completed(future_to_run):
-                run_accession = future_to_run[future]
-                try:
-                    success = future.result()
-                    if success:
-                        download_summary['downloaded_runs'] += 1
-                        # Count downloaded files
-                        fastq_files = list(Path(self.storage_config["cfdna_structure"]["fastq"]).glob(f"{run_accession}*.fastq*"))
-                        download_summary['downloaded_files'] += len(fastq_files)
-                    else:
-                        download_summary['failed_runs'] += 1
-                        download_summary['errors'].append(f"Failed to download run {run_accession}")
-                        
-                except Exception as e:
-                    self.logger.error(f"Error processing run {run_accession}: {e}")
-                    download_summary['failed_runs'] += 1
-                    download_summary['errors'].append(f"Error processing run {run_accession}: {str(e)}")
+            }, indent=True))
+        
+        # Scan the output directory once instead of globbing it per run
+        existing_files = self._snapshot_fastq_files()
+        
+        # Download runs as concurrent fasterq-dump subprocesses on one event loop
+        run_accessions = [run['accession'] for run in runs]
+        results = asyncio.run(self._adownload_runs(run_accessions, existing_files, prefetch))
+        
+        # Process completed downloads
+        for run_accession, result in zip(run_accessions, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error processing run {run_accession}: {result}")
+                download_summary['failed_runs'] += 1
+                download_summary['errors'].append(f"Error processing run {run_accession}: {str(result)}")
+            elif result:
+                download_summary['downloaded_runs'] += 1
+                download_summary['downloaded_files'] += len(result)
+            else:
+                download_summary['failed_runs'] += 1
+                download_summary['errors'].append(f"Failed to download run {run_accession}")
         
         # Save download summary
-        summary_file = Path(self.storage_config["cfdna_structure"]["metadata"]) / f"{project_accession}_download_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(download_summary, f, indent=2)
+        summary_file = self._metadata_dir / f"{project_accession}_download_summary.json"
+        with open(summary_file, 'wb') as f:
+            f.write(dumps_json(download_summary, indent=True))
         
         self.logger.info(f"Download completed for project {project_accession}")
         self.logger.info(f"Summary: {download_summary['downloaded_runs']}/{download_summary['total_runs']} runs downloaded")
@@ -445,6 +1061,30 @@ class NCBICfDNADownloader:
         """
         Prefetch a SRA run to local cache
         
+        Args:
+            run_accession: SRA run accession
+            
+        Returns:
+            True if prefetch successful, False otherwise
+        """
+        return asyncio.run(self._aprefetch_sra_run(run_accession))
+    
+    def _cached_sra_file(self, run_accession: str) -> Optional[Path]:
+        """Get the completely prefetched .sra file of a run, if there is one"""
+        sra_file = self._sra_dir / f"{run_accession}.sra"
+        
+        # aria2c keeps a control file next to incomplete downloads
+        if sra_file.exists() and not sra_file.with_name(f"{sra_file.name}.aria2").exists():
+            return sra_file
+        return None
+    
+    async def _aprefetch_sra_run(self, run_accession: str) -> bool:
+        """
+        Prefetch the .sra file of a run into the local SRA cache
+        
+        The file URL is resolved with srapath and downloaded by aria2c over several
+        connections; sra-tools prefetch is used if either tool is missing or fails.
+        
         Args:
             run_accession: SRA run accession
             
@@ -453,29 +1093,93 @@ class NCBICfDNADownloader:
         """
         self.logger.info(f"Prefetching SRA run: {run_accession}")
         
+        if self._cached_sra_file(run_accession) is not None:
+            self.logger.info(f"Run {run_accession} already prefetched")
+            return True
+        
+        sra_file = self._sra_dir / f"{run_accession}.sra"
         cmd = [
             'prefetch',
             '--max-size', '100G',  # Allow large files
-            '--output-directory', '.',
+            '--output-file', str(sra_file),
             run_accession
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.ncbi_config["timeout"])
+            if await self._aria2c_sra_run(run_accession):
+                return True
+            
+            # Discard an interrupted aria2c download; its control file would
+            # otherwise mark the file written by prefetch as incomplete
+            sra_file.unlink(missing_ok=True)
+            sra_file.with_name(f"{sra_file.name}.aria2").unlink(missing_ok=True)
+            
+            returncode, _, stderr_tail = await self._arun(cmd, run_accession, self._transfer_timeout)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 self.logger.info(f"Successfully prefetched run {run_accession}")
                 return True
             else:
-                self.logger.error(f"Prefetch failed for run {run_accession}: {result.stderr}")
+                self.logger.error(f"Prefetch failed for run {run_accession}: {stderr_tail}")
                 return False
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             self.logger.error(f"Prefetch timeout for run {run_accession}")
             return False
         except Exception as e:
             self.logger.error(f"Error prefetching run {run_accession}: {e}")
             return False
+    
+    async def _aria2c_sra_run(self, run_accession: str) -> bool:
+        """
+        Download the .sra file of a run with aria2c from the URL reported by srapath
+        
+        Args:
+            run_accession: SRA run accession
+            
+        Returns:
+            True if the file was downloaded, False to fall back to prefetch
+        """
+        try:
+            # Resolving the URL is a quick lookup, unlike the transfer itself
+            srapath_cmd = ['srapath', run_accession]
+            returncode, stdout, stderr_tail = await self._arun(srapath_cmd, run_accession, self._ncbi_timeout)
+            
+            urls = [line for line in stdout.split() if line.startswith(('https://', 'http://'))]
+            if returncode != 0 or not urls:
+                self.logger.warning(f"Could not resolve SRA URL for run {run_accession}: {stderr_tail}")
+                return False
+            
+            connections = str(self.download_config["aria2c_connections"])
+            cmd = [
+                'aria2c',
+                '-x', connections,  # Connections per server
+                '-s', connections,  # Segments per file
+                '-j', '1',
+                '-k', '10M',  # Minimum segment size
+                '--file-allocation=falloc',
+                '--continue=true',  # Resume partial downloads
+                '--summary-interval=0',
+                '--console-log-level=warn',
+                '-d', str(self._sra_dir),
+                '-o', f"{run_accession}.sra",
+                urls[0]
+            ]
+            
+            returncode, _, stderr_tail = await self._arun(cmd, run_accession, self._transfer_timeout)
+            if returncode != 0:
+                self.logger.warning(f"aria2c failed for run {run_accession}: {stderr_tail}")
+                return False
+            
+        except asyncio.TimeoutError:
+            self.logger.warning(f"aria2c timeout for run {run_accession}; using prefetch")
+            return False
+        except FileNotFoundError as e:
+            self.logger.warning(f"{e.filename} not installed; using prefetch for run {run_accession}")
+            return False
+        
+        self.logger.info(f"Successfully prefetched run {run_accession} with aria2c")
+        return True
 
 
 def main():
@@ -488,7 +1192,7 @@ def main():
     parser.add_argument("--search", action="store_true", help="Search for cfDNA projects")
     parser.add_argument("--max-runs", type=int, help="Maximum number of runs to download")
     parser.add_argument("--keywords", nargs="+", default=["cfDNA", "cell-free DNA"], help="Search keywords")
-    parser.add_argument("--prefetch", action="store_true", help="Use prefetch instead of direct download")
+    parser.add_argument("--prefetch", action="store_true", help="Prefetch .sra files with aria2c/prefetch before conversion")
     
     args = parser.parse_args()
     
@@ -504,13 +1208,13 @@ def main():
     
     elif args.project:
         # Download specific project
-        summary = downloader.download_project_data(args.project, args.max_runs)
+        summary = downloader.download_project_data(args.project, args.max_runs, args.prefetch)
         print(f"Download summary: {summary}")
     
     else:
         # Download all configured projects
         for project in downloader.config["cfdna_datasets"]["ncbi_datasets"]:
-            summary = downloader.download_project_data(project["accession"], args.max_runs)
+            summary = downloader.download_project_data(project["accession"], args.max_runs, args.prefetch)
             print(f"Download summary for {project['accession']}: {summary}")
 
 
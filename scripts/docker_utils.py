@@ -9,8 +9,45 @@ import subprocess
 import sys
 import os
 import json
+import functools
 from pathlib import Path
 
+try:
+    import docker
+    DOCKER_SDK_AVAILABLE = True
+except ImportError:
+    DOCKER_SDK_AVAILABLE = False
+
+PORTS = {"8000/tcp": 8000, "8888/tcp": 8888}
+
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Return a shared Docker SDK client, or None to fall back to the docker CLI."""
+    if not DOCKER_SDK_AVAILABLE:
+        return None
+    try:
+        return docker.from_env()
+    except docker.errors.DockerException as e:
+        print(f"Docker SDK unavailable, using docker CLI: {e}")
+        return None
+
+
+def sdk_volumes(*names):
+    """Bind-mount project directories from the current directory under /app."""
+    cwd = os.getcwd()
+    return {os.path.join(cwd, name): {"bind": f"/app/{name}", "mode": "rw"} for name in names}
+
+
+def sdk_gpu_options(gpu=True):
+    """Container options requesting all GPUs through the NVIDIA runtime."""
+    if not gpu:
+        return {}
+    return {
+        "runtime": "nvidia",
+        "device_requests": [docker.types.DeviceRequest(count=-1, capabilities=[["gpu"]])]
+    }
+
 
 def run_command(cmd, check=True, capture_output=False):
     """Run a shell command and return the result."""
@@ -31,6 +68,26 @@ def build_image(tag="fragment-fusion:latest", no_cache=False):
     """Build the FragmentFusion Docker image."""
     print(f"Building Docker image: {tag}")
     
+    client = get_client()
+    if client is not None:
+        # The low-level API streams the build log while the build runs
+        try:
+            for chunk in client.api.build(path=".", tag=tag, nocache=no_cache, rm=True, decode=True):
+                if "stream" in chunk:
+                    print(chunk["stream"], end="", flush=True)
+                elif "error" in chunk:
+                    print(f"Error building image: {tag}")
+                    print(f"Error: {chunk['error']}")
+                    sys.exit(1)
+            image = client.images.get(tag)
+        except docker.errors.DockerException as e:
+            print(f"Error building image: {tag}")
+            print(f"Error: {e}")
+            sys.exit(1)
+        
+        print(f"Successfully built image: {tag}")
+        return image
+    
     cmd = f"docker build -t {tag}"
     if no_cache:
         cmd += " --no-cache"
@@ -46,6 +103,25 @@ def run_container(image="fragment-fusion:latest", gpu=True, interactive=True):
     """Run the FragmentFusion container."""
     print(f"Running container from image: {image}")
     
+    # Interactive sessions need the CLI to attach a TTY
+    client = get_client()
+    if client is not None and not interactive:
+        try:
+            container = client.containers.run(
+                image,
+                detach=True,
+                volumes=sdk_volumes("data", "results", "logs", "src", "workflows", "scripts"),
+                ports=PORTS,
+                **sdk_gpu_options(gpu)
+            )
+        except docker.errors.DockerException as e:
+            print(f"Error running container from image: {image}")
+            print(f"Error: {e}")
+            return None
+        
+        print(f"Started container: {container.short_id}")
+        return container
+    
     cmd = "docker run"
     
     if gpu:
@@ -79,6 +155,35 @@ def start_dev_environment():
     """Start the development environment with Jupyter Lab."""
     print("Starting FragmentFusion development environment...")
     
+    client = get_client()
+    if client is not None:
+        # Build image if it doesn't exist
+        if not client.images.list(name="fragment-fusion:dev"):
+            print("Building development image...")
+            build_image("fragment-fusion:dev")
+        
+        # Start container with Jupyter Lab
+        try:
+            container = client.containers.run(
+                "fragment-fusion:dev",
+                "conda run -n fragment-fusion jupyter lab --ip=0.0.0.0 --port=8888 --no-browser --allow-root",
+                detach=True,
+                name="fragment-fusion-dev",
+                volumes=sdk_volumes("data", "results", "logs", "src", "workflows", "scripts", "configs", "tests"),
+                ports=PORTS,
+                environment={"PYTHONPATH": "/app/src"},
+                **sdk_gpu_options()
+            )
+        except docker.errors.DockerException as e:
+            print("Error starting development environment")
+            print(f"Error: {e}")
+            sys.exit(1)
+        
+        print("Development environment started!")
+        print("Jupyter Lab available at: http://localhost:8888")
+        print("API available at: http://localhost:8000")
+        return container
+    
     # Build image if it doesn't exist
     result = run_command("docker images fragment-fusion:dev", check=False, capture_output=True)
     if "fragment-fusion" not in result.stdout:
@@ -113,6 +218,20 @@ def stop_dev_environment():
     """Stop the development environment."""
     print("Stopping FragmentFusion development environment...")
     
+    client = get_client()
+    if client is not None:
+        try:
+            client.containers.get("fragment-fusion-dev").remove(force=True)
+        except docker.errors.NotFound:
+            print("No development environment found or already stopped.")
+            return None
+        except docker.errors.APIError as e:
+            print(f"Error stopping development environment: {e}")
+            return None
+        
+        print("Development environment stopped and removed.")
+        return None
+    
     cmd = "docker stop fragment-fusion-dev && docker rm fragment-fusion-dev"
     result = run_command(cmd, check=False)
     
@@ -167,6 +286,34 @@ def clean_docker():
     """Clean up Docker resources."""
     print("Cleaning up Docker resources...")
     
+    client = get_client()
+    if client is not None:
+        # Cleanup is best-effort, like the CLI path: report failures and carry on
+        # Stop and remove containers
+        for container in client.containers.list(all=True, filters={"ancestor": "fragment-fusion"}):
+            try:
+                container.remove(force=True)
+            except docker.errors.APIError as e:
+                print(f"Could not remove container {container.short_id}: {e}")
+        
+        # Remove images
+        for tag in ("fragment-fusion:latest", "fragment-fusion:dev"):
+            try:
+                client.images.remove(tag)
+            except docker.errors.ImageNotFound:
+                pass
+            except docker.errors.APIError as e:
+                print(f"Could not remove image {tag}: {e}")
+        
+        # Remove dangling images
+        try:
+            client.images.prune(filters={"dangling": True})
+        except docker.errors.APIError as e:
+            print(f"Could not prune dangling images: {e}")
+        
+        print("Docker cleanup completed.")
+        return
+    
     # Stop and remove containers
     run_command("docker stop $(docker ps -q --filter ancestor=fragment-fusion) 2>/dev/null || true", check=False)
     run_command("docker rm $(docker ps -aq --filter ancestor=fragment-fusion) 2>/dev/null || true", check=False)